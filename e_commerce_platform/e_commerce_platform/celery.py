@@ -0,0 +1,18 @@
+"""
+Celery config for e_commerce_platform project.
+
+It exposes the Celery app used by the background tasks of the project apps.
+
+For more information on this file, see
+https://docs.celeryq.dev/en/stable/django/first-steps-with-django.html
+"""
+
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'e_commerce_platform.settings')
+
+app = Celery('e_commerce_platform')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
@@ -119,6 +119,13 @@ SIMPLE_JWT = {
 }
 
 
+# Celery
+# https://docs.celeryq.dev/en/stable/django/first-steps-with-django.html
+
+CELERY_BROKER_URL = 'redis://localhost:6379/0'
+CELERY_RESULT_BACKEND = 'redis://localhost:6379/0'
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/4.2/topics/i18n/
 
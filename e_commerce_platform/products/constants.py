@@ -1,6 +1,14 @@
 USER_CREATION_SUCCESSFUL = "User created successfully"
 INVALID_CREDENTIALS = "Invalid credentials"
-DATA_UPLOAD_SUCCESSFUL_MESSAGE = "Data uploaded successfully"
 DATA_UPLOAD_FAILURE_MESSAGE = "Data upload failed"
+DATA_UPLOAD_QUEUED_MESSAGE = "Data upload queued"
+CSV_FILE_NOT_FOUND_MESSAGE = "CSV file not found"
 BULK_CREATE_BATCH_SIZE = 100
+CSV_READ_BLOCK_SIZE = 16 * 1024 * 1024
+PRODUCT_MERGE_FIELDS = ["price", "rating", "review_count", "quantity_sold"]
 SUMMARY_REPORT_FAILURE_MESSAGE = "Failed to create summary report"
+SUMMARY_REPORT_FIELDS = ["category", "total_revenue", "top_product", "top_product_quantity_sold"]
+SUMMARY_REPORT_CHUNK_SIZE = 2000
+PRODUCT_CSV_COLUMNS = [
+    "product_id", "product_name", "category", "price", "quantity_sold", "rating", "review_count"
+]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.15 on 2026-10-15 06:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['category', '-quantity_sold'], name='prod_cat_qty_idx'),
+        ),
+    ]
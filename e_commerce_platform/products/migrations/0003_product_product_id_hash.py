@@ -0,0 +1,48 @@
+# Generated by Django 4.2.15 on 2026-10-15 07:05
+
+import xxhash
+from django.db import migrations, models
+
+BATCH_SIZE = 2000
+
+
+def populate_product_id_hash(apps, schema_editor):
+    # The xxHash64 digest of the UTF-8 encoded product id as a signed 64-bit integer, frozen here rather than
+    # imported from the app
+    Product = apps.get_model("products", "Product")
+    products = Product.objects.only("product_id").iterator(chunk_size=BATCH_SIZE)
+    batch = []
+    for product in products:
+        digest = xxhash.xxh64_digest(product.product_id.encode("utf-8"))
+        product.product_id_hash = int.from_bytes(digest, "big", signed=True)
+        batch.append(product)
+        if len(batch) == BATCH_SIZE:
+            Product.objects.bulk_update(batch, ["product_id_hash"])
+            batch = []
+    Product.objects.bulk_update(batch, ["product_id_hash"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0002_product_category_quantity_sold_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='product_id_hash',
+            field=models.BigIntegerField(null=True),
+        ),
+        migrations.RunPython(populate_product_id_hash, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='product',
+            name='product_id_hash',
+            field=models.BigIntegerField(unique=True),
+        ),
+        migrations.AlterField(
+            model_name='product',
+            name='product_id',
+            field=models.CharField(max_length=100),
+        ),
+    ]
@@ -2,10 +2,16 @@ from django.db import models
 
 
 class Product(models.Model):
-    product_id = models.CharField(max_length=100, unique=True)
+    product_id = models.CharField(max_length=100)
+    product_id_hash = models.BigIntegerField(unique=True)
     product_name = models.CharField(max_length=255)
     category = models.CharField(max_length=255)
     price = models.FloatField()
     quantity_sold = models.IntegerField()
     rating = models.FloatField()
     review_count = models.IntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["category", "-quantity_sold"], name="prod_cat_qty_idx"),
+        ]
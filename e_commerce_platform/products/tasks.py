@@ -0,0 +1,16 @@
+from celery import shared_task
+from .upload_data import upload_data, extract_and_clean_product_data
+
+
+@shared_task
+def ingest_csv(csv_path: str) -> None:
+    """
+    Extracts, cleans and uploads the product data of a CSV file in the background.
+
+    Args:
+        csv_path (str): The file path to the CSV file containing product data.
+
+    Returns:
+        None: This function does not return any value.
+    """
+    upload_data(extract_and_clean_product_data(csv_path))
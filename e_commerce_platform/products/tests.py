@@ -1,3 +1,189 @@
+import os
+import tempfile
+from unittest import mock
+
+from django.db import DatabaseError
+from django.db.models.query import QuerySet
 from django.test import TestCase
+from django.urls import reverse
+
+from .models import Product
+from .upload_data import extract_and_clean_product_data, upload_data
+from . import constants
+
+
+class UploadDataTests(TestCase):
+    def upload_csv(self, rows, **kwargs):
+        """
+        Writes the given rows to a temporary CSV file, with the product CSV header, and uploads it.
+
+        Keyword arguments are passed on to `extract_and_clean_product_data`.
+        """
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as csv_file:
+            csv_file.write(",".join(constants.PRODUCT_CSV_COLUMNS) + "\n")
+            csv_file.writelines(row + "\n" for row in rows)
+        self.addCleanup(os.remove, csv_file.name)
+        upload_data(extract_and_clean_product_data(csv_file.name, **kwargs))
+
+    def assertProduct(self, product_id, price, rating, quantity_sold, review_count):
+        product = Product.objects.get(product_id=product_id)
+        self.assertAlmostEqual(product.price, price)
+        self.assertAlmostEqual(product.rating, rating)
+        self.assertEqual(product.quantity_sold, quantity_sold)
+        self.assertEqual(product.review_count, review_count)
+
+    def test_upload_twice_merges_into_existing_products(self):
+        rows = [
+            "P1,Widget,Tools,10.0,5,4.0,10",
+            "P2,Gadget,Tools,,3,,2",
+            "P3,Shirt,Apparel,20.0,,3.5,",
+            "P4,Pants,Apparel,30.0,7,,5",
+            "P5,Lamp,Home,15.0,2,4.5,1",
+        ]
+        self.upload_csv(rows)
+        self.upload_csv(rows)
+
+        self.assertEqual(Product.objects.count(), 5)
+        self.assertProduct("P1", price=10.0, rating=4.0, quantity_sold=10, review_count=20)
+        # Missing price and rating are filled with the price median and the category mean rating
+        self.assertProduct("P2", price=17.5, rating=4.0, quantity_sold=6, review_count=4)
+        # Missing quantity sold is filled with the median, missing review count with 0
+        self.assertProduct("P3", price=20.0, rating=3.5, quantity_sold=8, review_count=0)
+        self.assertProduct("P4", price=30.0, rating=3.5, quantity_sold=14, review_count=10)
+        self.assertProduct("P5", price=15.0, rating=4.5, quantity_sold=4, review_count=2)
+
+    def test_duplicate_product_ids_of_a_chunk_are_merged(self):
+        self.upload_csv([
+            "P1,Widget,Tools,10.0,5,4.0,10",
+            "P1,widget,TOOLS,20.0,5,2.0,1",
+            "P2,Gadget,Tools,5,0,3,2",
+            "P2,Gadget,Tools,7,0,5,2",
+        ])
+
+        self.assertEqual(Product.objects.count(), 2)
+        self.assertProduct("P1", price=15.0, rating=3.0, quantity_sold=10, review_count=11)
+        # Nothing sold, the price and rating of the first row are kept
+        self.assertProduct("P2", price=5.0, rating=3.0, quantity_sold=0, review_count=4)
+
+    def test_duplicate_rows_are_checked_against_the_existing_product(self):
+        self.upload_csv(["P1,Widget,Tools,10,5,4,1"])
+        self.upload_csv([
+            "P1,Widget,Garden,99,5,1,1",
+            "P1,Widget,Tools,20,5,2,1",
+        ])
+
+        self.assertProduct("P1", price=15.0, rating=3.0, quantity_sold=10, review_count=2)
+
+    def test_duplicate_rows_are_merged_whatever_the_block_size(self):
+        rows = [
+            "P1,Widget,Tools,10,5,4,1",
+            *(f"F{index},Filler,Tools,1,1,1,1" for index in range(100)),
+            "P1,Widget,Garden,99,5,1,1",
+            "P1,Widget,Tools,20,5,2,1",
+        ]
+        for block_size in (constants.CSV_READ_BLOCK_SIZE, 1024):
+            with self.subTest(block_size=block_size):
+                Product.objects.all().delete()
+                self.upload_csv(rows, block_size=block_size)
+
+                self.assertProduct("P1", price=15.0, rating=3.0, quantity_sold=10, review_count=2)
+
+    def test_missing_ratings_are_left_out_of_the_merged_rating(self):
+        # Category means are case-sensitive, 'TOOLS' has no rating to fill the missing one with
+        self.upload_csv([
+            "P1,Widget,Tools,10.0,5,4.0,10",
+            "P1,Widget,TOOLS,20.0,5,,1",
+        ])
+
+        self.assertProduct("P1", price=15.0, rating=4.0, quantity_sold=10, review_count=11)
+
+    def test_products_with_unfillable_values_are_skipped(self):
+        # No rating in the 'Garden' category to fill the missing one with
+        with self.assertLogs("products.upload_data", "WARNING"):
+            self.upload_csv([
+                "q1,Alpha,Tools,10.0,2,4.0,1",
+                "q2,Beta,Garden,12,1,,0",
+            ])
+
+        self.assertQuerySetEqual(Product.objects.values_list("product_id", flat=True), ["q1"])
+        self.assertProduct("q1", price=10.0, rating=4.0, quantity_sold=2, review_count=1)
+
+    def test_products_with_out_of_range_counts_are_skipped(self):
+        with self.assertLogs("products.upload_data", "WARNING"):
+            self.upload_csv([
+                "q1,Alpha,Tools,10.0,2,4.0,1",
+                "q2,Beta,Tools,12,3000000000,4.0,0",
+                "q3,Gamma,Tools,12,1,4.0,3000000000",
+            ])
+
+        self.assertQuerySetEqual(Product.objects.values_list("product_id", flat=True), ["q1"])
+
+    def test_name_or_category_mismatch_is_skipped(self):
+        self.upload_csv([
+            "P1,Widget,Tools,10.0,5,4.0,10",
+            "P1,Other,Tools,99.0,5,1.0,1",
+            "P2,Gadget,Tools,5.0,2,3.0,2",
+        ])
+        self.upload_csv([
+            "P1,Widget,Garden,20.0,5,2.0,1",
+            "P2,Gizmo,Tools,20.0,5,2.0,1",
+        ])
+
+        self.assertEqual(Product.objects.count(), 2)
+        product = Product.objects.get(product_id="P1")
+        self.assertEqual((product.product_name, product.category), ("Widget", "Tools"))
+        self.assertProduct("P1", price=10.0, rating=4.0, quantity_sold=5, review_count=10)
+        self.assertProduct("P2", price=5.0, rating=3.0, quantity_sold=2, review_count=2)
+
+
+class UploadDataViewTests(TestCase):
+    def test_upload_is_queued(self):
+        with tempfile.NamedTemporaryFile(suffix=".csv") as csv_file:
+            with mock.patch("products.views.ingest_csv.delay", return_value=mock.Mock(id="task-id")) as delay:
+                response = self.client.post(
+                    reverse("upload"), {"csv_path": csv_file.name}, content_type="application/json"
+                )
+
+        delay.assert_called_once_with(csv_file.name)
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(
+            response.json(),
+            {"success": True, "message": constants.DATA_UPLOAD_QUEUED_MESSAGE, "task_id": "task-id"}
+        )
+
+    def test_missing_csv_file_is_rejected(self):
+        with mock.patch("products.views.ingest_csv.delay") as delay:
+            response = self.client.post(
+                reverse("upload"), {"csv_path": "/nonexistent/products.csv"}, content_type="application/json"
+            )
+
+        delay.assert_not_called()
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"success": False, "message": constants.CSV_FILE_NOT_FOUND_MESSAGE})
+
+
+class SummaryReportTests(TestCase):
+    def test_summary_report_is_streamed_as_csv(self):
+        Product.objects.create(
+            product_id="P1", product_id_hash=1, product_name="Widget", category="Tools",
+            price=10.0, quantity_sold=5, rating=4.0, review_count=1
+        )
+
+        response = self.client.get(reverse("summary_report"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            b"".join(response.streaming_content).decode().splitlines(),
+            [",".join(constants.SUMMARY_REPORT_FIELDS), "Tools,50.0,Widget,5"]
+        )
+
+    def test_summary_report_database_error_is_reported(self):
+        def failing_iterator(*args, **kwargs):
+            raise DatabaseError("summary query failed")
+            yield
+
+        with mock.patch.object(QuerySet, "iterator", failing_iterator):
+            response = self.client.get(reverse("summary_report"))
 
-# Create your tests here.
+        self.assertEqual(response.status_code, 500)
+        self.assertFalse(response.streaming)
@@ -1,106 +1,339 @@
-from django.db.utils import IntegrityError
-from typing import Type, List
-from django.db.models import Model
+import logging
+from io import StringIO
+from itertools import islice
+from typing import Type, List, Dict, Optional, Tuple, Iterable, Iterator
+from django.db import connection, transaction
+from django.db.models import Model, CharField, IntegerField
+import numpy as np
+from numba import njit
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
 from .models import Product
+from .utils import hash_product_id
 from . import constants
 
+logger = logging.getLogger(__name__)
 
-def extract_and_clean_product_data(csv_path: str) -> pd.DataFrame:
+
+def extract_and_clean_product_data(
+    csv_path: str,
+    block_size: int = constants.CSV_READ_BLOCK_SIZE
+) -> Iterator[pd.DataFrame]:
     """
-    Extracts and cleans product data from a CSV file.
+    Extracts and cleans product data from a CSV file, chunk by chunk, using the multi-threaded pyarrow CSV reader.
 
     This function performs the following operations:
-        - Reads the CSV file into a DataFrame.
-        - Fills missing values in the 'price' and 'quantity_sold' columns with their respective medians.
-        - Fills missing values in the 'rating' column with the mean rating for each category.
-        - Converts 'price', 'quantity_sold', and 'rating' columns to numeric types, coercing errors.
-        - Fills missing values in the 'review_count' column with 0.
+        - Reads the numeric and 'category' columns once to infer their types over the whole file and to compute the
+          medians of 'price' and 'quantity_sold' and the mean rating for each category.
+        - Streams the CSV file in blocks of `block_size` bytes, and for each chunk:
+            - Converts 'price', 'quantity_sold', 'rating' and 'review_count' columns to numeric types, coercing errors
+              to missing values.
+            - Fills missing values in the 'price' and 'quantity_sold' columns with their respective medians.
+            - Fills missing values in the 'rating' column with the mean rating for each category.
+            - Fills missing values in the 'review_count' column with 0.
+            - Adds the 'product_id_hash' column (see `hash_product_id`).
+
+    Rows sharing the same 'product_id' and values the cleaning could not fill are kept as such, they are merged and
+    dropped by `upload_data` against the already existing records.
 
     Args:
         csv_path (str): The file path to the CSV file containing product data.
+        block_size (int): The number of bytes of the CSV file read and cleaned at a time.
 
-    Returns:
-        pd.DataFrame: A cleaned DataFrame with the following columns:
+    Yields:
+        pd.DataFrame: A cleaned chunk of the CSV file with the following columns:
             - 'price': The price of the product (numeric).
             - 'quantity_sold': The quantity of the product sold (numeric).
             - 'rating': The rating of the product, with missing values filled per category mean (numeric).
-            - 'review_count': The number of reviews for the product, with missing values filled with 0.
+            - 'review_count': The number of reviews for the product, with missing values filled with 0 (numeric).
+            - 'category': The category of the product (categorical).
+            - 'product_id_hash': The 64-bit hash of 'product_id', used as the lookup key of the products.
     """
+    numeric_columns = ["price", "quantity_sold", "rating", "review_count"]
+    column_types = {
+        "product_id": pa.string(),
+        "product_name": pa.string(),
+        "category": pa.dictionary(pa.int32(), pa.string()),
+    }
+
+    # Types are inferred from the whole file here, so the streaming reader below can't fail on a later block
+    stats_table = pacsv.read_csv(
+        csv_path,
+        convert_options=pacsv.ConvertOptions(
+            column_types=column_types,
+            include_columns=["category", *numeric_columns]
+        )
+    )
+    column_types.update({column: stats_table.schema.field(column).type for column in numeric_columns})
+    stats_df = stats_table.to_pandas()
+    del stats_table
+
+    price = pd.to_numeric(stats_df["price"], errors="coerce").to_numpy(dtype="float64")
+    quantity_sold = pd.to_numeric(stats_df["quantity_sold"], errors="coerce").to_numpy(dtype="float64")
+    rating = pd.to_numeric(stats_df["rating"], errors="coerce").to_numpy(dtype="float64")
+    price_median = float(np.nanmedian(price))
+    quantity_sold_median = float(np.nanmedian(quantity_sold))
+
+    # Per-category rating means from the categorical codes, rows without a category (code -1) are skipped
+    categories = stats_df["category"].cat.categories
+    category_codes = stats_df["category"].cat.codes.to_numpy()
+    rated = ~np.isnan(rating) & (category_codes >= 0)
+    rating_sums = np.bincount(category_codes[rated], weights=rating[rated], minlength=len(categories))
+    rating_counts = np.bincount(category_codes[rated], minlength=len(categories))
+    rating_means = np.full(len(categories) + 1, np.nan)
+    np.divide(rating_sums, rating_counts, out=rating_means[:-1], where=rating_counts > 0)
+    del stats_df
+
+    batches = pacsv.open_csv(
+        csv_path,
+        read_options=pacsv.ReadOptions(block_size=block_size),
+        convert_options=pacsv.ConvertOptions(
+            column_types=column_types,
+            include_columns=constants.PRODUCT_CSV_COLUMNS
+        )
+    )
+    for batch in batches:
+        df = batch.to_pandas()
+        for column in numeric_columns:
+            df[column] = pd.to_numeric(df[column], errors="coerce")
+
+        # Filling missing values, including the ones introduced by the numeric coercion
+        df = df.fillna({"price": price_median, "quantity_sold": quantity_sold_median})
+        # Unknown categories get index -1, which picks the trailing NaN of `rating_means`
+        category_rating_means = rating_means[categories.get_indexer(df["category"])]
+        chunk_rating = df["rating"].to_numpy(dtype="float64")
+        df["rating"] = np.where(np.isnan(chunk_rating), category_rating_means, chunk_rating)
+
+        # Filling review count with 0 if not present
+        df["review_count"] = df["review_count"].fillna(0)
+
+        df["product_id_hash"] = [hash_product_id(product_id) for product_id in df["product_id"]]
+
+        yield df
+
+
+def drop_invalid_products(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Drops the rows of a cleaned DataFrame that cannot be stored, logs their `product_id`s, and downcasts
+    'quantity_sold' and 'review_count' to int32.
 
-    df = pd.read_csv(csv_path)
-
-    # Filling missing values
-    df["price"].fillna(df["price"].median(), inplace=True)
-    df["quantity_sold"].fillna(df["quantity_sold"].median(), inplace=True)
-    df["rating"] = df.groupby("category")["rating"].transform(lambda x: x.fillna(x.mean()))
-
-    df["price"] = pd.to_numeric(df["price"], errors="coerce")
-    df["quantity_sold"] = pd.to_numeric(df["quantity_sold"], errors="coerce")
-    df["rating"] = pd.to_numeric(df["rating"], errors="coerce")
-
-    # Filling review count with 0 if not present
-    df["review_count"].fillna(0, inplace=True)
-
-    return df
+    A row cannot be stored when:
+        - It still has missing values. Every column of the product table is NOT NULL, so such a row would fail the
+          whole upload. Values are left missing by the cleaning when they cannot be filled, e.g. the rating of a
+          product whose category has no rating in the file, or the price when no row of the file has one.
+        - Its 'quantity_sold' or 'review_count' does not fit in the 32-bit integer columns of the product table,
+          which the downcast would otherwise silently wrap around.
 
+    Args:
+        df (pd.DataFrame): A cleaned DataFrame, as built by `extract_and_clean_product_data`.
 
-def modify_already_existing_data(product_instance: Type[Model]) -> None:
+    Returns:
+        pd.DataFrame: The DataFrame without the invalid rows.
     """
-    Modifies an existing product record in the database with new data from the provided product instance.
+    int32_info = np.iinfo("int32")
+    counts = df[["quantity_sold", "review_count"]]
+    is_invalid = df[constants.PRODUCT_CSV_COLUMNS].isna().any(axis=1) | (
+        (counts < int32_info.min) | (counts > int32_info.max)
+    ).any(axis=1)
+    if is_invalid.any():
+        logger.warning(
+            "Skipping %d products with missing or out of range values: %s",
+            is_invalid.sum(), ", ".join(df.loc[is_invalid, "product_id"].astype(str))
+        )
+        df = df[~is_invalid]
+
+    return df.astype({"quantity_sold": "int32", "review_count": "int32"})
+
+
+def merge_duplicate_products(df: pd.DataFrame, existing_products: Optional[Dict[int, Model]] = None) -> pd.DataFrame:
+    """
+    Merges the rows of a cleaned DataFrame that share the same `product_id` into a single row.
 
-    This function performs the following operations:
-        - Fetches an existing product record based on the `product_id` from the provided `product_instance`.
-        - If an existing product record is found and both the product name and category match (case-insensitive),
-          it updates the following attributes:
-            - `price`: A weighted average price based on the quantity sold.
-            - `rating`: A weighted average rating based on the quantity sold.
-            - `review_count`: The total number of reviews, summing up the existing and new review counts.
-            - `quantity_sold`: The updated quantity sold for the existing product.
-        - Saves the updated product record back to the database.
+    Rows are merged the same way `merge_products_data` merges new data into an existing record: only when the
+    product name and category match (case-insensitive), with 'price' and 'rating' averaged weighted by
+    'quantity_sold', and 'review_count' and 'quantity_sold' summed up. The rows of a product are checked against its
+    existing record when there is one, and against its first row otherwise. Rows whose name or category do not
+    match are dropped. Missing prices and ratings are ignored by the averages.
 
     Args:
-        product_instance (Type[models.Model]): An instance of a product model containing new data to be merged with
-            the existing product record. The instance should have at least the following attributes:
-            - `product_id`: The unique identifier for the product.
-            - `product_name`: The name of the product.
-            - `category`: The category of the product.
-            - `price`: The price of the product.
-            - `rating`: The rating of the product.
-            - `review_count`: The number of reviews for the product.
-            - `quantity_sold`: The quantity of the product sold.
+        df (pd.DataFrame): A cleaned DataFrame, as built by `extract_and_clean_product_data`.
+        existing_products (Optional[Dict[int, Model]]): The already existing records by `product_id_hash`, as
+            shared by `upload_data`.
 
     Returns:
-        None: This function does not return any value.
+        pd.DataFrame: The DataFrame with a single row per `product_id`.
+    """
+    is_duplicate = df["product_id"].duplicated()
+    if not is_duplicate.any():
+        return df
+
+    lowered = pd.DataFrame({
+        "product_name": df["product_name"].str.lower(),
+        "category": df["category"].astype("object").str.lower()
+    })
+    reference = lowered.groupby(df["product_id"], sort=False).transform("first")
+    if existing_products:
+        existing_product_objs = [existing_products.get(product_id_hash) for product_id_hash in df["product_id_hash"]]
+        existing_lowered = pd.DataFrame(
+            [
+                (obj.product_name.lower(), obj.category.lower())
+                if obj is not None and obj.product_id == product_id else (None, None)
+                for obj, product_id in zip(existing_product_objs, df["product_id"])
+            ],
+            columns=["product_name", "category"],
+            index=df.index
+        )
+        reference = existing_lowered.fillna(reference)
+    same_product = (
+        (lowered["product_name"] == reference["product_name"]) &
+        (lowered["category"] == reference["category"])
+    )
+    df = df[same_product]
+
+    # A missing price or rating is left out of its weighted average, weight and quantity alike, instead of being
+    # averaged as 0. A product without any value keeps it missing, to be dropped by `drop_invalid_products`.
+    weights = {}
+    for column in ("price", "rating"):
+        weights[f"{column}_weight"] = df[column] * df["quantity_sold"]
+        weights[f"{column}_quantity"] = df["quantity_sold"].where(df[column].notna())
+    grouped = df.assign(**weights).groupby("product_id", sort=False)
+    merged = grouped.agg(
+        product_name=("product_name", "first"),
+        category=("category", "first"),
+        price=("price", "first"),
+        rating=("rating", "first"),
+        review_count=("review_count", "sum"),
+        product_id_hash=("product_id_hash", "first")
+    ).join(
+        grouped[[*weights, "quantity_sold"]].sum(min_count=1)
+    ).reset_index()
+
+    # Products whose quantity sold is 0 keep the first price and rating they were given
+    for column in ("price", "rating"):
+        quantity_sold = merged[f"{column}_quantity"].to_numpy(dtype="float64")
+        merged[column] = np.divide(
+            merged[f"{column}_weight"].to_numpy(dtype="float64"), quantity_sold,
+            out=merged[column].to_numpy(dtype="float64"), where=~np.isnan(quantity_sold) & (quantity_sold != 0)
+        )
+    return merged[df.columns]
+
+
+@njit(cache=True)
+def merge_products_kernel(
+    pair_indexes: np.ndarray,
+    old_price: np.ndarray,
+    old_rating: np.ndarray,
+    old_review_count: np.ndarray,
+    old_quantity_sold: np.ndarray,
+    new_price: np.ndarray,
+    new_rating: np.ndarray,
+    new_review_count: np.ndarray,
+    new_quantity_sold: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
     """
-    try:
-        product_id = product_instance.product_id
-        existing_product_obj = Product.objects.filter(product_id=product_id)
-        if existing_product_obj:
-            existing_product_obj = existing_product_obj[0]
-            if product_instance.product_name.lower() == existing_product_obj.product_name.lower() and \
-                product_instance.category.lower() == existing_product_obj.category.lower():
+    Computes the merged data of product records, compiled with Numba.
 
-                new_review_count = existing_product_obj.review_count + product_instance.review_count
-                new_quantity_sold = existing_product_obj.quantity_sold + product_instance.quantity_sold
-                new_rating = (
-                    (existing_product_obj.rating  * existing_product_obj.quantity_sold) + 
-                    (product_instance.rating * product_instance.quantity_sold) / new_quantity_sold
-                )
+    The new values at position `i` are merged into the record at position `pair_indexes[i]` of the old values:
+    'price' and 'rating' are averaged weighted by 'quantity_sold', 'review_count' and 'quantity_sold' are summed up.
+    Records whose total quantity sold is 0 keep their price and rating.
 
-                new_price = (
-                    (existing_product_obj.price  * existing_product_obj.quantity_sold) + 
-                    (product_instance.price * product_instance.quantity_sold) / new_quantity_sold
-                )
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: The merged price, rating, review count and quantity
+            sold of each record.
+    """
+    price_weight = old_price * old_quantity_sold
+    rating_weight = old_rating * old_quantity_sold
+    review_count = old_review_count.copy()
+    quantity_sold = old_quantity_sold.copy()
+    for i in range(pair_indexes.shape[0]):
+        index = pair_indexes[i]
+        price_weight[index] += new_price[i] * new_quantity_sold[i]
+        rating_weight[index] += new_rating[i] * new_quantity_sold[i]
+        review_count[index] += new_review_count[i]
+        quantity_sold[index] += new_quantity_sold[i]
+
+    price = old_price.copy()
+    rating = old_rating.copy()
+    for index in range(quantity_sold.shape[0]):
+        if quantity_sold[index] != 0:
+            price[index] = price_weight[index] / quantity_sold[index]
+            rating[index] = rating_weight[index] / quantity_sold[index]
+    return price, rating, review_count, quantity_sold
+
+
+def merge_products_data(existing_product_objs: List[Model], product_instances: List[Model]) -> List[Model]:
+    """
+    Merges the data of new product instances into the existing product records they are paired with, without
+    saving them.
+
+    `product_instances[i]` is merged into `existing_product_objs[i]`, and only when both the product name and
+    category match (case-insensitive). The same record can appear several times in `existing_product_objs`, in which
+    case all of its matching instances are merged into it. The following attributes of the records are updated in
+    memory, computed for all the pairs at once by `merge_products_kernel`:
+        - `price`: A weighted average price based on the quantity sold.
+        - `rating`: A weighted average rating based on the quantity sold.
+        - `review_count`: The total number of reviews, summing up the existing and new review counts.
+        - `quantity_sold`: The total quantity sold, summing up the existing and new quantities.
 
-                existing_product_obj.price = new_price
-                existing_product_obj.rating = new_rating
-                existing_product_obj.review_count = new_review_count
-                existing_product_obj.quantity_sold = product_instance.quantity_sold
-                existing_product_obj.save()
+    Args:
+        existing_product_objs (List[Model]): The product records already known for the `product_id`s.
+        product_instances (List[Model]): The product instances containing new data to be merged, paired by position
+            with `existing_product_objs`.
 
-    except Exception as e:
-        print(e)
+    Returns:
+        List[Model]: The distinct records of `existing_product_objs` that were modified.
+    """
+    if not product_instances:
+        return []
+
+    same_product = (
+        np.char.lower([obj.product_name for obj in existing_product_objs]) ==
+        np.char.lower([instance.product_name for instance in product_instances])
+    ) & (
+        np.char.lower([obj.category for obj in existing_product_objs]) ==
+        np.char.lower([instance.category for instance in product_instances])
+    )
+
+    merged_product_objs = []
+    merged_product_indexes = {}
+    pair_indexes = []
+    for existing_product_obj, is_same_product in zip(existing_product_objs, same_product):
+        if is_same_product:
+            index = merged_product_indexes.setdefault(id(existing_product_obj), len(merged_product_objs))
+            if index == len(merged_product_objs):
+                merged_product_objs.append(existing_product_obj)
+            pair_indexes.append(index)
+
+    if not merged_product_objs:
+        return []
+
+    new_product_instances = [instance for instance, is_same in zip(product_instances, same_product) if is_same]
+
+    def values(objs, field_name):
+        return np.array([getattr(obj, field_name) for obj in objs], dtype="float64")
+
+    merged_price, merged_rating, merged_review_count, merged_quantity_sold = merge_products_kernel(
+        np.array(pair_indexes, dtype="int64"),
+        values(merged_product_objs, "price"),
+        values(merged_product_objs, "rating"),
+        values(merged_product_objs, "review_count"),
+        values(merged_product_objs, "quantity_sold"),
+        values(new_product_instances, "price"),
+        values(new_product_instances, "rating"),
+        values(new_product_instances, "review_count"),
+        values(new_product_instances, "quantity_sold")
+    )
+
+    for merged_product_obj, price, rating, review_count, quantity_sold in zip(
+        merged_product_objs, merged_price, merged_rating, merged_review_count, merged_quantity_sold
+    ):
+        merged_product_obj.price = float(price)
+        merged_product_obj.rating = float(rating)
+        merged_product_obj.review_count = int(review_count)
+        merged_product_obj.quantity_sold = int(quantity_sold)
+
+    return merged_product_objs
 
 
 def create_table_instances(table: Type[Model], table_dataframe: pd.DataFrame) -> List[Model]:
@@ -118,59 +351,238 @@ def create_table_instances(table: Type[Model], table_dataframe: pd.DataFrame) ->
     Returns:
         List[Model]: A list of instances of the model, created based on the rows in the DataFrame.
     """
-    table_instances = []
-    for _, row in table_dataframe.iterrows():
-        a_table_instance = table(**row)
-        table_instances.append(a_table_instance)
-    return table_instances
+    # to_dict(orient="records") converts the frame in one pass instead of building a Series per row
+    records = table_dataframe.to_dict(orient="records")
+    return [table(**record) for record in records]
 
 
-def upload_data_in_batches(table: Type[Model], table_instances: List[Model], batch_size: int) -> None:
+def build_product_upsert_sql(table: Type[Model], columns: List[str], rows_sql: str) -> str:
     """
-    Uploads a list of model instances to the database in batches.
+    Builds an `INSERT ... ON CONFLICT (product_id_hash) DO UPDATE` statement for the product table.
 
-    This function inserts model instances into the database in batches. If an error occurs during bulk creation,
-    it attempts to handle individual instances that failed to be created by saving them individually. If an
-    `IntegrityError` occurs, it tries to modify the existing data.
+    Rows whose `product_id_hash` already exists are merged into the existing record in SQL, the same way
+    `merge_products_data` does, provided the `product_id` is the same (not a hash collision) and the product name
+    and category match (case-insensitive).
+    Both PostgreSQL and SQLite support this syntax.
 
     Args:
-        table (Type[Model]): The Django model class used to create and upload instances. It should be a subclass of `django.db.models.Model`.
-        table_instances (List[Model]): A list of model instances to be uploaded to the database.
-        batch_size (int): The number of instances to include in each batch during the upload process.
+        table (Type[Model]): The Django model class whose table the rows are inserted into.
+        columns (List[str]): The columns of the inserted rows.
+        rows_sql (str): The `VALUES` or `SELECT` clause producing the rows to insert.
+
+    Returns:
+        str: The SQL statement.
+    """
+    qn = connection.ops.quote_name
+    db_table = qn(table._meta.db_table)
+    column_list = ", ".join(qn(column) for column in columns)
+    return f"""
+        INSERT INTO {db_table} ({column_list})
+        {rows_sql}
+        ON CONFLICT (product_id_hash) DO UPDATE SET
+            price = COALESCE(
+                ({db_table}.price * {db_table}.quantity_sold + EXCLUDED.price * EXCLUDED.quantity_sold) /
+                NULLIF({db_table}.quantity_sold + EXCLUDED.quantity_sold, 0),
+                {db_table}.price
+            ),
+            rating = COALESCE(
+                ({db_table}.rating * {db_table}.quantity_sold + EXCLUDED.rating * EXCLUDED.quantity_sold) /
+                NULLIF({db_table}.quantity_sold + EXCLUDED.quantity_sold, 0),
+                {db_table}.rating
+            ),
+            review_count = {db_table}.review_count + EXCLUDED.review_count,
+            quantity_sold = {db_table}.quantity_sold + EXCLUDED.quantity_sold
+        WHERE {db_table}.product_id = EXCLUDED.product_id
+            AND lower({db_table}.product_name) = lower(EXCLUDED.product_name)
+            AND lower({db_table}.category) = lower(EXCLUDED.category)
+    """
+
+
+def fetch_existing_products(
+    table: Type[Model],
+    product_id_hashes: pd.Series,
+    existing_products: Dict[int, Model]
+) -> None:
+    """
+    Fetches the records of the given `product_id_hash`es that are not in `existing_products` yet, in a single query,
+    and adds them to it.
+
+    Args:
+        table (Type[Model]): The Django model class of the records.
+        product_id_hashes (pd.Series): The `product_id_hash`es of the incoming rows.
+        existing_products (Dict[int, Model]): The already existing records by `product_id_hash`.
 
     Returns:
         None: This function does not return any value.
     """
-    for bacth_start in range(0, len(table_instances), batch_size):
-        try:
-            table.objects.bulk_create(table_instances[bacth_start:bacth_start + batch_size])
-        except Exception as e:
-            for a_instance_index in range(bacth_start, bacth_start+batch_size):
-                try:
-                    table_instances[a_instance_index].save()
-                except IntegrityError:
-                    modify_already_existing_data(table_instances[a_instance_index])
-                except IndexError:
-                    break
-                except Exception as e:
-                    print(e)
+    unknown_product_id_hashes = {
+        product_id_hash for product_id_hash in product_id_hashes.tolist()
+        if product_id_hash not in existing_products
+    }
+    existing_products.update(table.objects.in_bulk(unknown_product_id_hashes, field_name="product_id_hash"))
+
+
+def upload_data_in_batches(
+    table: Type[Model],
+    table_dataframe: pd.DataFrame,
+    batch_size: int,
+    existing_products: Optional[Dict[int, Model]] = None
+) -> None:
+    """
+    Uploads the rows of a DataFrame to the database in batches.
+
+    This function fetches the already existing records for the incoming `product_id_hash`es (see
+    `fetch_existing_products`), and splits the rows into new and existing ones:
+        - New rows are streamed as plain tuples, without creating model instances, into one multi-row upsert
+          statement per batch (see `build_product_upsert_sql`). A row inserted concurrently, or repeated in the
+          DataFrame, is merged rather than failing the batch.
+        - Existing rows are turned into model instances, merged in memory into their records (see
+          `merge_products_data`) and written back with one `UPDATE` statement executed for all of them. Rows
+          whose `product_id_hash` collides with the one of a different `product_id` are skipped.
 
+    Args:
+        table (Type[Model]): The Django model class used to upload the rows. It should be a subclass of `django.db.models.Model`.
+        table_dataframe (pd.DataFrame): A DataFrame where each row represents the fields and values for a model
+            instance. The DataFrame's columns should match the model's fields.
+        batch_size (int): The number of rows to include in each batch during the upload process.
+        existing_products (Optional[Dict[int, Model]]): The already existing records by `product_id_hash`, shared
+            across calls so records are only fetched once per upload. The records are kept in sync with the merged
+            data.
 
-def upload_data(data: pd.DataFrame) -> None:
+    Returns:
+        None: This function does not return any value.
     """
-    Converts a DataFrame to model instances and uploads them to the database in batches.
+    if existing_products is None:
+        existing_products = {}
+    product_id_hashes = table_dataframe["product_id_hash"]
+    fetch_existing_products(table, product_id_hashes, existing_products)
+    is_existing = product_id_hashes.isin(existing_products.keys())
+
+    merge_targets = []
+    merge_instances = []
+    for a_instance in create_table_instances(table, table_dataframe[is_existing]):
+        existing_product_obj = existing_products[a_instance.product_id_hash]
+        if existing_product_obj.product_id == a_instance.product_id:
+            merge_targets.append(existing_product_obj)
+            merge_instances.append(a_instance)
+
+    merged_product_objs = merge_products_data(merge_targets, merge_instances)
+
+    qn = connection.ops.quote_name
+    merge_fields = [table._meta.get_field(field_name) for field_name in constants.PRODUCT_MERGE_FIELDS]
+    update_sql = (
+        f"UPDATE {qn(table._meta.db_table)} "
+        f"SET {', '.join(f'{qn(field.column)} = %s' for field in merge_fields)} "
+        f"WHERE {qn(table._meta.pk.column)} = %s"
+    )
+    updated_rows = [
+        [getattr(obj, field.attname) for field in merge_fields] + [obj.pk] for obj in merged_product_objs
+    ]
+
+    fields = [field for field in table._meta.concrete_fields if not field.primary_key]
+    row_placeholder = f"({', '.join(['%s'] * len(fields))})"
+    new_rows = table_dataframe.loc[~is_existing, [field.attname for field in fields]].itertuples(
+        index=False, name=None
+    )
+    with connection.cursor() as cursor:
+        if updated_rows:
+            cursor.executemany(update_sql, updated_rows)
+        while batch := list(islice(new_rows, batch_size)):
+            rows_sql = f"VALUES {', '.join([row_placeholder] * len(batch))}"
+            cursor.execute(
+                build_product_upsert_sql(table, [field.column for field in fields], rows_sql),
+                [value for row in batch for value in row]
+            )
+
+
+def copy_data_to_postgres(table: Type[Model], data: pd.DataFrame) -> None:
+    """
+    Uploads a DataFrame to a PostgreSQL database using `COPY` instead of ORM inserts.
 
-    This function processes a DataFrame, creates model instances from its rows, and uploads these instances
-    to the database in batches. It utilizes the `create_table_instances` function to create instances and
-    the `upload_data_in_batches` function to handle batch uploads.
+    This function performs the following operations:
+        - Serializes the DataFrame to an in-memory CSV buffer.
+        - Streams the buffer with `COPY` into a temporary staging table, using `copy_expert` with psycopg2 and
+          `copy` with psycopg 3, the two drivers supported by Django's PostgreSQL backend.
+        - Moves the staged rows into the model's table with the upsert of `build_product_upsert_sql`. The rows are
+          expected to have distinct `product_id`s (see `merge_duplicate_products`), otherwise only one row of a
+          repeated `product_id_hash` is used.
 
     Args:
+        table (Type[Model]): The Django model class whose table the data is uploaded to.
         data (pd.DataFrame): A DataFrame where each row represents the fields and values for a model instance.
             The DataFrame's columns should match the model's fields.
 
     Returns:
         None: This function does not return any value.
     """
-    product_instances = create_table_instances(Product, data)
+    fields = [field for field in table._meta.concrete_fields if not field.primary_key]
+    columns = [field.column for field in fields]
+    integer_columns = [field.column for field in fields if isinstance(field, IntegerField)]
+    string_columns = [field.column for field in fields if isinstance(field, CharField)]
+
+    buffer = StringIO()
+    data[columns].astype({column: "int64" for column in integer_columns}).to_csv(buffer, header=False, index=False)
+    buffer.seek(0)
+
+    qn = connection.ops.quote_name
+    db_table = qn(table._meta.db_table)
+    staging_table = qn(f"{table._meta.db_table}_staging")
+    column_list = ", ".join(qn(column) for column in columns)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE TEMP TABLE {staging_table} AS "
+            f"SELECT {column_list} FROM {db_table} WITH NO DATA"
+        )
+        # Empty strings are kept as such, like the ORM upload does, instead of being read as NULL
+        copy_sql = (
+            f"COPY {staging_table} ({column_list}) FROM STDIN "
+            f"WITH (FORMAT csv, FORCE_NOT_NULL ({', '.join(qn(column) for column in string_columns)}))"
+        )
+        if hasattr(cursor, "copy_expert"):
+            cursor.copy_expert(copy_sql, buffer)
+        else:
+            with cursor.copy(copy_sql) as copy:
+                copy.write(buffer.getvalue())
+        cursor.execute(build_product_upsert_sql(
+            table,
+            columns,
+            f"SELECT DISTINCT ON (product_id_hash) {column_list} FROM {staging_table} ORDER BY product_id_hash"
+        ))
+        cursor.execute(f"DROP TABLE {staging_table}")
+
+
+def upload_data(data: Iterable[pd.DataFrame]) -> None:
+    """
+    Uploads DataFrame chunks to the database in batches.
+
+    This function processes each DataFrame chunk and uploads its rows to the database in batches. The already
+    existing records of a chunk are fetched first (see `fetch_existing_products`), and shared with the next
+    chunks. Against them, the rows sharing the same `product_id` are merged (see `merge_duplicate_products`), the
+    rows that cannot be stored are dropped and 'quantity_sold' and 'review_count' downcast to int32 (see
+    `drop_invalid_products`). A product inserted by a chunk is an existing record for the next ones, so
+    its rows are merged the same way whatever the size of the chunks.
+    The rows are then uploaded with `upload_data_in_batches`, or streamed with `copy_data_to_postgres` on
+    PostgreSQL. The whole upload runs in a single transaction.
+
+    Args:
+        data (Iterable[pd.DataFrame]): DataFrame chunks, as yielded by `extract_and_clean_product_data`, where each
+            row represents the fields and values for a model instance. The DataFrame's columns should match the
+            model's fields.
+
+    Returns:
+        None: This function does not return any value.
+    """
     batch_size = constants.BULK_CREATE_BATCH_SIZE
-    upload_data_in_batches(Product, product_instances, batch_size)
+    existing_products = {}
+    with transaction.atomic():
+        for chunk in data:
+            fetch_existing_products(Product, chunk["product_id_hash"], existing_products)
+            chunk = merge_duplicate_products(chunk, existing_products)
+            chunk = drop_invalid_products(chunk)
+
+            if connection.vendor == "postgresql":
+                copy_data_to_postgres(Product, chunk)
+                continue
+
+            upload_data_in_batches(Product, chunk, batch_size, existing_products)
@@ -1,36 +1,61 @@
 import csv
-from typing import List, Dict
-from io import StringIO
+from itertools import chain, islice
+from typing import List, Dict, Iterable, Iterator
+import xxhash
+from django.db.models import F, OuterRef, Subquery, Sum
 from .models import Product
+from . import constants
 
 
-def export_to_csv(data: List[Dict[str, any]]) -> StringIO:
+def hash_product_id(product_id: str) -> int:
     """
-    Exports a list of dictionaries to a CSV format and returns it as a StringIO object.
+    Hashes a product id to the signed 64-bit integer stored in `Product.product_id_hash`.
 
     Args:
-        data (List[Dict[str, any]]): A list of dictionaries where each dictionary represents a row in the CSV.
-            The keys of the dictionaries should be the same and represent the CSV column headers.
+        product_id (str): The unique identifier for the product.
 
     Returns:
-        StringIO: An in-memory file-like object containing the CSV data.
+        int: The xxHash64 digest of the UTF-8 encoded product id, as a signed 64-bit integer.
+    """
+    return int.from_bytes(xxhash.xxh64_digest(product_id.encode("utf-8")), "big", signed=True)
+
+
+class Echo:
+    """
+    A file-like object that returns what is written to it instead of storing it.
+
+    It lets `csv.writer` and `csv.DictWriter` produce the CSV one line at a time, so the lines can be streamed.
+    """
+    def write(self, value: str) -> str:
+        return value
+
+
+def export_to_csv(data: Iterable[Dict[str, any]], fieldnames: List[str]) -> Iterator[str]:
+    """
+    Exports dictionaries to CSV format, lazily yielding one CSV line at a time.
+
+    Args:
+        data (Iterable[Dict[str, any]]): The dictionaries where each dictionary represents a row in the CSV.
+        fieldnames (List[str]): The CSV column headers, which should be the keys of the dictionaries.
+
+    Returns:
+        Iterator[str]: The CSV lines, starting with the header.
 
     Example:
         data = [
             {"name": "Alice", "age": 30, "city": "New York"},
             {"name": "Bob", "age": 25, "city": "Los Angeles"}
         ]
-        csv_output = export_to_csv(data)
-        print(csv_output.getvalue())
+        csv_output = export_to_csv(data, ["name", "age", "city"])
+        print("".join(csv_output))
     """
-    output = StringIO()
-    writer = csv.DictWriter(output, fieldnames=data[0].keys())
-    writer.writeheader()
-    writer.writerows(data)
-    return output
+    writer = csv.DictWriter(Echo(), fieldnames=fieldnames)
+    yield writer.writeheader()
+    for row in data:
+        yield writer.writerow(row)
 
 
-def generate_summary() -> StringIO:
+def generate_summary() -> Iterator[str]:
     """
     Generates a summary report of the highest-selling product in each category.
 
@@ -40,28 +65,21 @@ def generate_summary() -> StringIO:
         - top_product: The name of the product with the highest quantity sold in the category.
         - top_product_quantity_sold: The quantity sold of the top product in the category.
 
-    The summary is exported as a CSV file and returned as a StringIO object.
+    The whole summary is computed by the database in a single grouped query, whose rows are fetched in chunks
+    and exported as CSV lines as they are consumed. The query is run, and its first row fetched, before returning,
+    so a database error is raised by this function rather than while the report is streamed.
 
     Returns:
-        StringIO: An in-memory file-like object containing the CSV data of the summary report.
+        Iterator[str]: The CSV lines of the summary report, starting with the header.
     """
-    categories = Product.objects.values("category").distinct()
-    summary_data = []
-
-    for category in categories:
-        category_name = category["category"]
-        products = Product.objects.filter(category=category_name)
-
-        # calculating total revenue
-        total_revenue = sum([product.price * product.quantity_sold for product in products])
-        top_product = max(products, key=lambda p: p.quantity_sold)
-
-        summary_data.append({
-            "category": category_name,
-            "total_revenue": total_revenue,
-            "top_product": top_product.product_name,
-            "top_product_quantity_sold": top_product.quantity_sold
-        })
+    top_products = Product.objects.filter(category=OuterRef("category")).order_by("-quantity_sold", "id")
+    summary_data = Product.objects.values("category").annotate(
+        total_revenue=Sum(F("price") * F("quantity_sold")),
+        top_product=Subquery(top_products.values("product_name")[:1]),
+        top_product_quantity_sold=Subquery(top_products.values("quantity_sold")[:1])
+    ).order_by()
 
-    summary = export_to_csv(summary_data)
+    rows = summary_data.iterator(chunk_size=constants.SUMMARY_REPORT_CHUNK_SIZE)
+    first_rows = list(islice(rows, 1))
+    summary = export_to_csv(chain(first_rows, rows), constants.SUMMARY_REPORT_FIELDS)
     return summary
@@ -1,15 +1,16 @@
+import os
 from rest_framework.views import APIView
 from rest_framework import status
 from rest_framework.response import Response
-from django.http import JsonResponse, HttpResponse
-from .upload_data import upload_data, extract_and_clean_product_data
+from django.http import JsonResponse, StreamingHttpResponse
+from .tasks import ingest_csv
 from .utils import generate_summary
 from . import constants
 
 
 class UploadData(APIView):
     """
-        Upload data
+        Queue the upload of data from a csv file
     """
     def post(self, request):
         response_status = status.HTTP_400_BAD_REQUEST
@@ -20,12 +21,16 @@ class UploadData(APIView):
         try:
             data = request.data
             csv_path = data["csv_path"]
-            data_df = extract_and_clean_product_data(csv_path)
-            upload_data(data_df)
-            response_status = status.HTTP_200_OK
+            if not os.path.isfile(csv_path):
+                res["message"] = constants.CSV_FILE_NOT_FOUND_MESSAGE
+                return Response(res, status=response_status)
+
+            task = ingest_csv.delay(csv_path)
+            response_status = status.HTTP_202_ACCEPTED
             res = {
                 "success": True,
-                "message": constants.DATA_UPLOAD_SUCCESSFUL_MESSAGE
+                "message": constants.DATA_UPLOAD_QUEUED_MESSAGE,
+                "task_id": task.id
             }
         except Exception as e:
             return Response(e)
@@ -40,7 +45,7 @@ class SummaryReport(APIView):
     def get(self, request):
         try:
             summary = generate_summary()
-            response = HttpResponse(summary.getvalue(), content_type="text/csv")
+            response = StreamingHttpResponse(summary, content_type="text/csv")
             response["Content-Disposition"] = "attachment; filename=summary_report.csv"
         except Exception as e:
             print(constants.SUMMARY_REPORT_FAILURE_MESSAGE)